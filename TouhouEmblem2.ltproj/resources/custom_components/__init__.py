@@ -1,10 +1,79 @@
+import ast
 import os
+import sys
+import time
 import importlib
+import logging
 
-for module_name in os.listdir(os.path.dirname(__file__)):
-    if module_name == '__init__.py' or module_name[-3:] != '.py':
-        continue
-    print("Importing Custom Components in %s..." % module_name)
-    module = importlib.import_module('custom_components.' + module_name[:-3])
-    importlib.reload(module)
-del module_name
\ No newline at end of file
+from app.data.database.item_components import ItemComponent
+from app.data.database.skill_components import SkillComponent
+
+# Each module is imported exactly once. They are only reloaded when this
+# package itself is being reloaded (hot reload from the editor), which is
+# the only time a module can already be in sys.modules.
+
+# Scanning for duplicate nids parses every module, so it only runs on hot
+# reload (when the source has been edited) or when this env var is set
+CHECK_DUPLICATES = bool(os.environ.get('LT_CHECK_CUSTOM_COMPONENTS'))
+
+registry = {'skill': {}, 'item': {}}
+duplicates = []
+import_times = {}
+_base_kinds = {'SkillComponent': 'skill', 'ItemComponent': 'item'}
+_defined_in = {}  # (kind, nid) -> where it was first defined
+
+def _base_name(node) -> str:
+    return node.attr if isinstance(node, ast.Attribute) else getattr(node, 'id', '')
+
+def _check_duplicates(module_name, path):
+    # Scanned from source, since a class redefined later in the same module
+    # has already replaced the earlier one by the time the module is imported
+    with open(path, encoding='utf-8') as fp:
+        tree = ast.parse(fp.read(), path)
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        kinds = [_base_kinds[_base_name(base)] for base in node.bases if _base_name(base) in _base_kinds]
+        if not kinds:
+            continue
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Constant) and \
+                    any(isinstance(t, ast.Name) and t.id == 'nid' for t in stmt.targets):
+                key = (kinds[0], stmt.value.value)
+                where = '%s.%s (line %d)' % (module_name[:-3], node.name, node.lineno)
+                if key in _defined_in:
+                    duplicates.append(key)
+                    logging.warning("Duplicate custom %s component nid %s: %s shadows %s",
+                                    key[0], key[1], where, _defined_in[key])
+                else:
+                    _defined_in[key] = where
+
+def _register(module):
+    for obj in vars(module).values():
+        if not isinstance(obj, type) or obj.__module__ != module.__name__ or not getattr(obj, 'nid', None):
+            continue
+        if issubclass(obj, SkillComponent):
+            kind = 'skill'
+        elif issubclass(obj, ItemComponent):
+            kind = 'item'
+        else:
+            continue
+        registry[kind].setdefault(obj.nid, obj)
+
+def _load(hot_reload: bool):
+    for module_name in sorted(os.listdir(os.path.dirname(__file__))):
+        if module_name == '__init__.py' or module_name[-3:] != '.py':
+            continue
+        if hot_reload or CHECK_DUPLICATES:
+            _check_duplicates(module_name, os.path.join(os.path.dirname(__file__), module_name))
+        full_name = __name__ + '.' + module_name[:-3]
+        start = time.perf_counter()
+        if hot_reload and full_name in sys.modules:
+            module = importlib.reload(sys.modules[full_name])
+        else:
+            module = importlib.import_module(full_name)
+        import_times[module_name] = time.perf_counter() - start
+        logging.info("Imported Custom Components in %s (%.1f ms)", module_name, import_times[module_name] * 1000)
+        _register(module)
+
+_load(hot_reload=any(name.startswith(__name__ + '.') for name in sys.modules))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import functools
+
+from app.engine.game_state import game
+
+# Splash and post-combat AOE components are evaluated for every candidate
+# position the AI scores, so the Manhattan spheres they need are built
+# once per radius and reused.
+
+@functools.lru_cache(maxsize=32)
+def manhattan_offsets(ranges: frozenset) -> tuple:
+    if not ranges:
+        return ()
+    max_range = max(ranges)
+    return tuple((dx, dy)
+                 for dx in range(-max_range, max_range + 1)
+                 for dy in range(-max_range + abs(dx), max_range - abs(dx) + 1)
+                 if abs(dx) + abs(dy) in ranges)
+
+@functools.lru_cache(maxsize=1024)
+def positions_in_range(position: tuple, ranges: frozenset, bounds: tuple) -> tuple:
+    x, y = position
+    min_x, min_y, max_x, max_y = bounds
+    return tuple((x + dx, y + dy) for dx, dy in manhattan_offsets(ranges)
+                 if min_x <= x + dx <= max_x and min_y <= y + dy <= max_y)
+
+def units_in_range(position: tuple, ranges) -> list:
+    """
+    Returns every unit on the board whose Manhattan distance from position is in ranges.
+    Both paths read the board's occupancy; when there are fewer units than tiles
+    in the sphere, only the tiles units are standing on are probed.
+    """
+    ranges = frozenset(ranges)
+    offsets = manhattan_offsets(ranges)
+    if len(game.units) < len(offsets):
+        x, y = position
+        positions = {unit.position for unit in game.units
+                     if unit.position and abs(unit.position[0] - x) + abs(unit.position[1] - y) in ranges}
+    else:
+        positions = positions_in_range(position, ranges, game.board.bounds)
+    units = (game.board.get_unit(pos) for pos in positions)
+    return [unit for unit in units if unit]
@@ -8,6 +8,7 @@ from app.engine import (action, banner, combat_calcs, engine, equations,
 from app.engine.game_state import game
 from app.engine.objects.unit import UnitObject
 from app.utilities import utils, static_random
+from custom_components import aoe_utils, expression_cache
 
 
 class DoNothing(ItemComponent):
@@ -38,12 +39,9 @@ class AllyBlastAOEExceptUnit(ItemComponent):
     value = None
     
     def splash(self, unit, item, position) -> tuple:
-        ranges = set(range(self._get_power(unit)))
-        splash = game.target_system.find_manhattan_spheres(ranges, position[0], position[1])
-        splash = {pos for pos in splash if game.tilemap.check_bounds(pos)}
-        from app.engine import skill_system
-        splash = [game.board.get_unit(s) for s in splash]
-        splash = [s.position for s in splash if s and skill_system.check_ally(unit, s) and s is not unit]
+        ranges = range(self._get_power(unit))
+        splash = aoe_utils.units_in_range(position, ranges)
+        splash = [s.position for s in splash if s is not unit and skill_system.check_ally(unit, s)]
         return None, splash
 
     def _get_power(self, unit) -> int:
@@ -104,9 +102,8 @@ class PropertyChangeExpression(ItemComponent):
     def on_hit(self, actions, playback, unit, item, target, item2, target_pos, mode, attack_info):
         target_item = item.data.get('target_item')
         if target_item:
-            from app.engine import evaluate
             try:
-                action.do(action.ModifyItemComponent(target_item, self.value['weapon_property'], int(evaluate.evaluate(self.value['modify_expression'], target)), None, True))
+                action.do(action.ModifyItemComponent(target_item, self.value['weapon_property'], int(expression_cache.evaluate(self.value['modify_expression'], target)), None, True))
             except Exception as e:
                 print("Fuck you.")
             
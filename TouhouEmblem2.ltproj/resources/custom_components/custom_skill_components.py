@@ -12,6 +12,7 @@ from app.utilities import utils, static_random
 from app.engine.combat import playback as pb
 from app.utilities.enums import Strike
 from app.events import event_commands, regions, triggers
+from custom_components import aoe_utils, expression_cache
 
 import logging
 import random
@@ -118,6 +119,29 @@ class EventAfterCombatWhenHit(SkillComponent):
             game.events.trigger_specific_event(self.value, unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
         self._got_hit = False
         
+def trigger_combat_event(component, unit, target, item, item2, mode):
+    """
+    Triggers the component's event, or queues it until the end of combat if the
+    component sets coalesce_events. Queued triggers of the same event for the
+    same unit and target are merged, so multi-strike combats fire it only once.
+    """
+    if not getattr(component, 'coalesce_events', False):
+        game.events.trigger_specific_event(component.value, unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
+        return
+    if component._pending_events is None:
+        component._pending_events = {}
+    key = (component.value, unit.nid, target.nid if target else None)
+    if key not in component._pending_events:
+        component._pending_events[key] = (unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
+
+def flush_combat_events(component):
+    # Called from end_combat so the queued triggers keep their place in
+    # skill component order, ahead of any event_after_combat on the same skill
+    if component._pending_events:
+        for (event_nid, _, _), (unit, target, position, local_args) in component._pending_events.items():
+            game.events.trigger_specific_event(event_nid, unit, target, position, local_args)
+    component._pending_events = None
+
 class EventWhenHit(SkillComponent):
     nid = 'event_when_hit'
     desc = 'Calls event when unit is hit'
@@ -125,10 +149,20 @@ class EventWhenHit(SkillComponent):
 
     expose = ComponentType.Event
     value = ''
+
+    coalesce_events = True
+    _pending_events = None
     
     def after_take_strike(self, actions, playback, unit, item, target, item2, mode, attack_info, strike):
         if strike == Strike.HIT or strike == Strike.CRIT:
-            game.events.trigger_specific_event(self.value, unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
+            trigger_combat_event(self, unit, target, item, item2, mode)
+
+    def end_combat(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        flush_combat_events(self)
+
+    def end_combat_unconditional(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        # Anything still queued means end_combat was skipped by the skill's condition
+        flush_combat_events(self)
             
 class EventAfterStrike(SkillComponent):
     nid = 'event_after_strike'
@@ -137,10 +171,20 @@ class EventAfterStrike(SkillComponent):
 
     expose = ComponentType.Event
     value = ''
+
+    coalesce_events = True
+    _pending_events = None
     
     def after_strike(self, actions, playback, unit, item, target, item2, mode, attack_info, strike):
         if strike == Strike.HIT or strike == Strike.CRIT:
-            game.events.trigger_specific_event(self.value, unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
+            trigger_combat_event(self, unit, target, item, item2, mode)
+
+    def end_combat(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        flush_combat_events(self)
+
+    def end_combat_unconditional(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        # Anything still queued means end_combat was skipped by the skill's condition
+        flush_combat_events(self)
             
 class EventOnUpkeep(SkillComponent):
     nid = 'event_on_upkeep'
@@ -210,22 +254,21 @@ class EventWhenDodging(SkillComponent):
 
     expose = ComponentType.Event
     value = ''
+
+    coalesce_events = True
+    _pending_events = None
     
     def after_take_strike(self, actions, playback, unit, item, target, item2, mode, attack_info, strike):
         if strike != Strike.HIT and strike != Strike.CRIT:
-            game.events.trigger_specific_event(self.value, unit, target, unit.position, {'item': item, 'mode': mode, 'item2': item2})
-            
-class CannotUseSpecificItem(SkillComponent):
-    nid = 'cannot_use_specific_item'
-    desc = "Unit cannot use or equip item with matching UID"
-    tag = SkillTags.BASE
-    
-    expose = ComponentType.Int
-    value = 1
+            trigger_combat_event(self, unit, target, item, item2, mode)
 
-    def available(self, unit, item) -> bool:
-        return item.uid != self.value
-        
+    def end_combat(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        flush_combat_events(self)
+
+    def end_combat_unconditional(self, playback, unit: UnitObject, item, target: UnitObject, item2, mode):
+        # Anything still queued means end_combat was skipped by the skill's condition
+        flush_combat_events(self)
+            
 class MustUseReach(SkillComponent):
     nid = 'must_use_reach'
     desc = "Unit cannot equip non-reach items"
@@ -255,9 +298,8 @@ class ExpressionGrowthChange(SkillComponent):
     value = []
 
     def growth_change(self, unit=None):
-        from app.engine import evaluate
         try:
-            return {stat[0]: int(evaluate.evaluate(stat[1], unit)) for stat in self.value}
+            return {stat[0]: int(expression_cache.evaluate(stat[1], unit)) for stat in self.value}
         except Exception as e:
             logging.error("Couldn't evaluate conditional for skill %s: [%s], %s", self.skill.nid, str(self.value), e)
         return {stat[0]: 0 for stat in self.value}
@@ -323,10 +365,9 @@ class DeathRecoil2(SkillComponent):
     value = 1
 
     def after_strike(self, actions, playback, unit, item, target, item2, mode, attack_info, strike):
-        from app.engine import evaluate
         try:
             local_args = {'item': item, 'item2': item2, 'mode': mode, 'skill': self.skill, 'attack_info': attack_info}
-            calc_value = int(evaluate.evaluate(self.value, unit, target, unit.position, local_args))
+            calc_value = int(expression_cache.evaluate(self.value, unit, target, unit.position, local_args))
             actions.append(action.ChangeHP(unit, -calc_value))
             if strike == Strike.CRIT:
                 playback.append(pb.DamageCrit(unit, item, unit, calc_value, calc_value))
@@ -346,10 +387,9 @@ class CiggieRecoil(SkillComponent):
     value = 1
 
     def after_strike(self, actions, playback, unit, item, target, item2, mode, attack_info, strike):
-        from app.engine import evaluate
         try:
             local_args = {'item': item, 'item2': item2, 'mode': mode, 'skill': self.skill, 'attack_info': attack_info}
-            calc_value = int(evaluate.evaluate(self.value, unit, target, unit.position, local_args))
+            calc_value = int(expression_cache.evaluate(self.value, unit, target, unit.position, local_args))
             actions.append(action.ChangeHP(unit, -calc_value))
             if strike == Strike.CRIT:
                 playback.append(pb.DamageCrit(unit, item, unit, calc_value, calc_value))
@@ -372,9 +412,8 @@ class PostCombatSplashEvaluated(SkillComponent):
     author = 'Lord_Tweed'
 
     def post_combat_damage(self, unit) -> int:
-        from app.engine import evaluate
         try:
-            return int(evaluate.evaluate(self.value, unit))
+            return int(expression_cache.evaluate(self.value, unit))
         except Exception as e:
             logging.error("Couldn't evaluate %s conditional (%s)", self.value, e)
         return 0
@@ -391,14 +430,10 @@ class PostCombatSplashAOEEvaluated(SkillComponent):
 
     def end_combat(self, playback, unit, item, target, item2, mode):
         if target and skill_system.check_enemy(unit, target):
-            r = set(range(self.value+1))
-            locations = game.target_system.get_shell(
-                {target.position}, r, game.board.bounds)
             damage = get_pc_damage(unit, self.skill)
             if damage > 0:
-                for loc in locations:
-                    target2 = game.board.get_unit(loc)
-                    if target2 and target2 is not target and skill_system.check_enemy(unit, target2):
+                for target2 in aoe_utils.units_in_range(target.position, range(self.value+1)):
+                    if target2 is not target and skill_system.check_enemy(unit, target2):
                         end_health = target2.get_hp() - damage
                         action.do(action.SetHP(target2, max(1, end_health)))
                         
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import ast
+import functools
+
+# Shared by the custom components that evaluate a user-written expression
+# every strike or level-up. Each distinct expression is compiled once and
+# kept in a bounded LRU, so repeated calls skip the parse entirely.
+# Passing the compiled code to evaluate.evaluate relies on the engine handing
+# its argument straight to eval; if it ever treats it as a string instead,
+# the original expression string is evaluated as before.
+
+MAX_EXPRESSIONS = 256
+
+def _constant(expr):
+    if not isinstance(expr, str):
+        return expr
+    try:
+        value = ast.literal_eval(expr.strip())
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+@functools.lru_cache(maxsize=MAX_EXPRESSIONS)
+def compile_expression(expr):
+    """
+    Returns a callable with the same signature as evaluate.evaluate.
+    Numeric literals such as "15" are returned as constants without
+    ever reaching the evaluator.
+    """
+    constant = _constant(expr)
+    if constant is not None:
+        return lambda unit1=None, unit2=None, position=None, local_args=None: constant
+
+    code = compile(expr.strip(), '<%s>' % expr, 'eval')
+
+    def evaluate_compiled(unit1=None, unit2=None, position=None, local_args=None):
+        from app.engine import evaluate
+        try:
+            return evaluate.evaluate(code, unit1, unit2, position, local_args)
+        except (TypeError, AttributeError):
+            return evaluate.evaluate(expr, unit1, unit2, position, local_args)
+    return evaluate_compiled
+
+def evaluate(expr, unit1=None, unit2=None, position=None, local_args=None):
+    return compile_expression(expr)(unit1, unit2, position, local_args)
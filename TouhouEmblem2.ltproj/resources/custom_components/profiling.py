@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import time
+
+from custom_components import registry
+
+# Opt-in timing of custom component hooks. While disabled nothing is
+# wrapped, so the hooks run at full speed; enable() swaps every public
+# method of the registered custom components for a timed wrapper and
+# disable() puts the originals back.
+#
+# Debug entry points, for the debug console or a python event:
+#   from custom_components import profiling
+#   profiling.start()  # clear previous results and start timing
+#   profiling.stop()   # stop, log the report and write the Chrome trace
+#   profiling.sync()   # start or stop to match the _profile_components game var
+
+MAX_TRACE_EVENTS = 100000
+TRACE_PATH = os.path.join('saves', 'component_profile_trace.json')
+
+stats = {}  # (component nid, hook name) -> [call count, total seconds]
+trace = []
+_originals = {}
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+def _wrap(cls, name, func):
+    key = (cls.nid, name)
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            entry = stats.setdefault(key, [0, 0.])
+            entry[0] += 1
+            entry[1] += end - start
+            if len(trace) < MAX_TRACE_EVENTS:
+                trace.append({'name': '%s.%s' % key, 'ph': 'X', 'pid': 0, 'tid': 0,
+                              'ts': start * 1e6, 'dur': (end - start) * 1e6})
+    return timed
+
+def enable():
+    if is_enabled():
+        return
+    for components in registry.values():
+        for cls in components.values():
+            for name, func in list(vars(cls).items()):
+                if name.startswith('_') or not callable(func) or isinstance(func, type):
+                    continue
+                _originals[(cls, name)] = func
+                setattr(cls, name, _wrap(cls, name, func))
+
+def disable():
+    for (cls, name), func in _originals.items():
+        setattr(cls, name, func)
+    _originals.clear()
+
+def start():
+    reset()
+    enable()
+
+def stop():
+    disable()
+    log_report()
+    dump_chrome_trace(TRACE_PATH)
+
+def sync(game_vars=None):
+    """Starts or stops profiling to match the _profile_components game var"""
+    if game_vars is None:
+        from app.engine.game_state import game
+        game_vars = game.game_vars
+    if bool(game_vars.get('_profile_components')) == is_enabled():
+        return
+    if is_enabled():
+        stop()
+    else:
+        start()
+
+def reset():
+    stats.clear()
+    trace.clear()
+
+def report(limit: int = 30) -> str:
+    rows = sorted(stats.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+    lines = ['%-40s %-28s %8s %10s %10s' % ('component', 'hook', 'calls', 'total ms', 'avg us')]
+    for (nid, hook), (count, total) in rows:
+        lines.append('%-40s %-28s %8d %10.2f %10.2f' % (nid, hook, count, total * 1e3, total * 1e6 / count))
+    return '\n'.join(lines)
+
+def log_report(limit: int = 30):
+    logging.info("Custom component hook timings:\n%s", report(limit))
+
+def dump_chrome_trace(path: str):
+    try:
+        with open(path, 'w') as fp:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, fp)
+    except OSError as e:
+        logging.error("Couldn't write component profile trace to %s (%s)", path, e)
+        return
+    logging.info("Wrote component profile trace to %s", path)